@@ -1,14 +1,21 @@
 import streamlit as st
+import atexit
+import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 import jieba
 import re
+import threading
 from collections import Counter
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from itertools import takewhile
+from pathlib import Path
 from pyecharts.charts import WordCloud, Bar, Line, Pie, Radar, Scatter, Funnel, Gauge
 from pyecharts import options as opts
 from pyecharts.globals import ThemeType
-from streamlit_echarts import st_pyecharts  # Streamlit集成pyecharts
+from streamlit_echarts import st_echarts  # Streamlit集成ECharts
 
 # ---------------------- 1. 全局配置 ----------------------
 # 页面基础设置
@@ -19,42 +26,99 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# 预加载jieba词典（后台线程执行，不阻塞页面；词典未加载完时分词会等待jieba内部的初始化锁）
+@st.cache_resource
+def _warm_up_jieba() -> threading.Thread:
+    """启动jieba词典预加载线程（st.cache_resource保证每个进程只执行一次）"""
+    thread = threading.Thread(target=jieba.initialize, daemon=True)
+    thread.start()
+    return thread
+
+_warm_up_jieba()
+
 # 加载停用词表
+@st.cache_resource
 def load_stopwords():
-    """加载停用词（优先本地文件，无则用默认集合）"""
-    default_stopwords = {
+    """加载停用词（优先本地文件，无则用默认集合；每个进程只读取一次）"""
+    default_stopwords = frozenset({
         "的", "了", "是", "我", "你", "他", "她", "它", "们", "在", "和", "与", "或",
         "就", "都", "而", "及", "即", "也", "又", "还", "因", "为", "以", "于", "之",
         "这", "那", "此", "彼", "个", "些", "能", "可", "会", "应", "要", "将", "把",
         "对", "对于", "关于", "通过", "随着", "按照", "基于", "根据", "如果", "假如"
-    }
+    })
     try:
-        with open("stopwords.txt", "r", encoding="utf-8") as f:
-            return set([line.strip() for line in f if line.strip()])
+        return frozenset(Path("stopwords.txt").read_text(encoding="utf-8").split())
     except FileNotFoundError:
         st.warning("未找到停用词文件，使用默认停用词表")
         return default_stopwords
 
 STOPWORDS = load_stopwords()
 
+# 全局HTTP会话（连接池复用TCP/TLS连接，避免每次爬取重新握手）
+@st.cache_resource
+def _create_session() -> requests.Session:
+    """创建HTTP会话（st.cache_resource保证脚本重跑时复用同一连接池）"""
+    session = requests.Session()
+    session.headers.update({
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    })
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=Retry(total=2, backoff_factor=0.3))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    atexit.register(session.close)
+    return session
+
+_SESSION = _create_session()
+MAX_BODY_BYTES = 2_000_000  # 单个页面最多读取的字节数
+_TOO_LARGE_MSG = f"页面过大（超过{MAX_BODY_BYTES // 1_000_000}MB），已放弃解析"
+
+# HTML解析器（优先使用C实现的lxml，未安装时回退到内置html.parser）
+try:
+    import lxml  # noqa: F401
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+
+# 文本清洗正则（一次遍历，仅保留中文及常用中文标点）
+_KEEP_RE = re.compile(r"[^\u4e00-\u9fa5，。！？；：、（）【】]+")
+
 # ---------------------- 2. 核心功能函数 ----------------------
 def crawl_url_article(url: str) -> tuple:
     """爬取URL文章正文"""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    }
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        response.encoding = response.apparent_encoding  # 自动识别编码
-        soup = BeautifulSoup(response.text, "html.parser")
+        # 流式读取响应体，超过上限即放弃，避免超大页面占满内存
+        with _SESSION.get(url, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            if int(response.headers.get("Content-Length") or 0) > MAX_BODY_BYTES:
+                return None, _TOO_LARGE_MSG
+            chunks, total = [], 0
+            for chunk in response.iter_content(65536):
+                total += len(chunk)
+                if total > MAX_BODY_BYTES:
+                    return None, _TOO_LARGE_MSG
+                chunks.append(chunk)
+            # 优先使用响应头声明的编码（ISO-8859-1为requests的缺省值，视为未声明）
+            encoding = response.encoding
+        body = b"".join(chunks)
+        # 未声明时交给BeautifulSoup自行识别（先查<meta>声明，再做统计探测）
+        from_encoding = encoding if encoding and encoding.lower() != "iso-8859-1" else None
+        soup = BeautifulSoup(body, _HTML_PARSER, from_encoding=from_encoding)
         
         # 移除无关标签
         for tag in soup(["script", "style", "nav", "footer", "aside", "header"]):
             tag.decompose()
         
         # 提取正文（适配新闻/博客页面）
-        content_tags = soup.find_all("article") or soup.find_all("div", class_=lambda x: x and ("content" in x.lower() or "article" in x.lower())) or soup.find_all("p")
+        # 一次遍历取出所有候选标签，按 article > 正文div > p 的优先级选用
+        articles, divs, paragraphs = [], [], []
+        for tag in soup.select("article, div[class*=content i], div[class*=article i], p"):
+            if tag.name == "article":
+                articles.append(tag)
+            elif tag.name == "div":
+                divs.append(tag)
+            else:
+                paragraphs.append(tag)
+        content_tags = articles or divs or paragraphs
         article_text = "\n".join([tag.get_text().strip() for tag in content_tags if tag.get_text().strip()])
         
         if not article_text:
@@ -66,39 +130,74 @@ def crawl_url_article(url: str) -> tuple:
 def clean_and_segment(text: str) -> tuple:
     """文本清洗+分词+词频统计"""
     # 清洗文本
-    text = re.sub(r"<[^>]+>", "", text)  # 移除HTML标签
-    text = re.sub(r"[0-9a-zA-Z\s+]", "", text)  # 移除数字/字母/多余空格
-    text = re.sub(r"[^\u4e00-\u9fa5，。！？；：、（）【】]", "", text)  # 仅保留中文
+    text = _KEEP_RE.sub("", text)  # 仅保留中文及常用标点（HTML标签已由BeautifulSoup去除）
     
     # 分词+过滤停用词/单字
-    seg_list = jieba.lcut(text)
-    seg_list = [word for word in seg_list if word not in STOPWORDS and len(word) > 1 and word.strip()]
-    
-    # 词频统计
-    word_count = Counter(seg_list)
-    return seg_list, word_count
+    sw = STOPWORDS  # 局部绑定，减少循环内的全局查找
+    # 分词结果以生成器直接送入Counter统计，不保留完整分词列表
+    word_count = Counter(word for word in jieba.cut(text) if len(word) > 1 and word not in sw)
+    seg_count = sum(word_count.values())  # 有效分词数
+    return seg_count, word_count
 
-def filter_low_freq_words(word_count: Counter, min_freq: int) -> Counter:
-    """过滤低频词"""
-    return Counter({word: count for word, count in word_count.items() if count >= min_freq})
+def top_k_min_freq(word_count: Counter, min_freq: int, k: int = 20) -> list:
+    """取词频TOP-k并过滤低频词（most_common已按词频降序，遇到低频词即停止）"""
+    return list(takewhile(lambda item: item[1] >= min_freq, word_count.most_common(k)))
+
+@st.cache_data(ttl=3600, max_entries=128, show_spinner=False)
+def _cached_crawl(url: str) -> str:
+    """按URL缓存爬取结果（失败时抛异常，异常不会被缓存，便于重试）"""
+    article_text, error = crawl_url_article(url)
+    if error:
+        raise RuntimeError(error)
+    return article_text
+
+@st.cache_data(ttl=3600, max_entries=128, show_spinner=False)
+def _cached_segment(text: str) -> tuple:
+    """按正文内容缓存分词+词频统计结果"""
+    return clean_and_segment(text)
+
+def _crawl_one(url: str) -> tuple:
+    """带缓存爬取单个URL，返回(正文, 错误信息)"""
+    try:
+        return _cached_crawl(url), ""
+    except RuntimeError as e:
+        return None, str(e)
+
+def crawl_url_articles(urls: list) -> list:
+    """多线程并发爬取多个URL（共享全局会话连接池），结果顺序与输入一致"""
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(8, len(urls))) as executor:
+        return list(executor.map(_crawl_one, urls))
 
 # ---------------------- 3. 图表生成函数 ----------------------
-def generate_chart(chart_type: str, word_data: list):
+# 图表公共初始化配置（各图表共用，关闭动画）
+_INIT = opts.InitOpts(
+    theme=ThemeType.LIGHT,
+    width="100%",
+    height="600px",
+    animation_opts=opts.AnimationOpts(animation=False)
+)
+# 大数据量渲染配置（数据点超过阈值时ECharts启用渐进式渲染；large模式仅柱状图/散点图支持）
+_PROGRESSIVE_SERIES_OPTS = {"progressive": 2000, "progressiveThreshold": 3000}
+_LARGE_SERIES_OPTS = {"large": True, "largeThreshold": 2000, **_PROGRESSIVE_SERIES_OPTS}
+
+def generate_chart(chart_type: str, word_data: tuple):
     """根据选择的图表类型生成Pyecharts图表"""
     # 取TOP20数据
-    top20_data = word_data[:20]
-    words = [item[0] for item in top20_data]
-    counts = [item[1] for item in top20_data]
+    top20_data = list(word_data[:20])
+    words, counts = map(list, zip(*top20_data)) if top20_data else ([], [])
+    cmax = max(counts, default=1)  # 雷达图各指标共用的最大值，只计算一次
     
     if chart_type == "词云":
         c = (
-            WordCloud(init_opts=opts.InitOpts(theme=ThemeType.LIGHT, width="100%", height="600px"))
+            WordCloud(init_opts=_INIT)
             .add("", top20_data, word_size_range=[20, 100])
             .set_global_opts(title_opts=opts.TitleOpts(title="词频TOP20词云图", subtitle="过滤低频词后"))
         )
     elif chart_type == "柱状图":
         c = (
-            Bar(init_opts=opts.InitOpts(theme=ThemeType.LIGHT, width="100%", height="600px"))
+            Bar(init_opts=_INIT)
             .add_xaxis(words)
             .add_yaxis("词频", counts)
             .reversal_axis()  # 横向柱状图（适配长文本）
@@ -107,31 +206,33 @@ def generate_chart(chart_type: str, word_data: list):
                 xaxis_opts=opts.AxisOpts(name="词频"),
                 yaxis_opts=opts.AxisOpts(name="词汇")
             )
+            .set_series_opts(sampling="lttb", **_LARGE_SERIES_OPTS)
         )
     elif chart_type == "折线图":
         c = (
-            Line(init_opts=opts.InitOpts(theme=ThemeType.LIGHT, width="100%", height="600px"))
+            Line(init_opts=_INIT)
             .add_xaxis(words)
             .add_yaxis("词频", counts, markpoint_opts=opts.MarkPointOpts(data=[opts.MarkPointItem(type_="max"), opts.MarkPointItem(type_="min")]))
             .set_global_opts(title_opts=opts.TitleOpts(title="词频TOP20折线图"))
+            .set_series_opts(sampling="lttb", **_PROGRESSIVE_SERIES_OPTS)
         )
     elif chart_type == "饼图":
         c = (
-            Pie(init_opts=opts.InitOpts(theme=ThemeType.LIGHT, width="100%", height="600px"))
+            Pie(init_opts=_INIT)
             .add("", top20_data)
             .set_global_opts(title_opts=opts.TitleOpts(title="词频TOP20饼图"), legend_opts=opts.LegendOpts(orient="vertical", pos_top="10%", pos_left="80%"))
             .set_series_opts(label_opts=opts.LabelOpts(formatter="{b}: {c}"))
         )
     elif chart_type == "雷达图":
         c = (
-            Radar(init_opts=opts.InitOpts(theme=ThemeType.LIGHT, width="100%", height="600px"))
-            .add_schema(schema=[opts.RadarIndicatorItem(name=word, max_=max(counts)) for word in words[:10]])  # 仅展示前10个（避免雷达图过密）
+            Radar(init_opts=_INIT)
+            .add_schema(schema=[opts.RadarIndicatorItem(name=word, max_=cmax) for word in words[:10]])  # 仅展示前10个（避免雷达图过密）
             .add("词频", [counts[:10]])
             .set_global_opts(title_opts=opts.TitleOpts(title="词频TOP10雷达图"))
         )
     elif chart_type == "散点图":
         c = (
-            Scatter(init_opts=opts.InitOpts(theme=ThemeType.LIGHT, width="100%", height="600px"))
+            Scatter(init_opts=_INIT)
             .add_xaxis(words)
             .add_yaxis("词频", counts)
             .set_global_opts(
@@ -139,10 +240,11 @@ def generate_chart(chart_type: str, word_data: list):
                 xaxis_opts=opts.AxisOpts(axislabel_opts=opts.LabelOpts(rotate=45)),
                 yaxis_opts=opts.AxisOpts(name="词频")
             )
+            .set_series_opts(**_LARGE_SERIES_OPTS)
         )
     elif chart_type == "漏斗图":
         c = (
-            Funnel(init_opts=opts.InitOpts(theme=ThemeType.LIGHT, width="100%", height="600px"))
+            Funnel(init_opts=_INIT)
             .add("", top20_data)
             .set_global_opts(title_opts=opts.TitleOpts(title="词频TOP20漏斗图"))
             .set_series_opts(label_opts=opts.LabelOpts(formatter="{b}: {c}"))
@@ -151,7 +253,7 @@ def generate_chart(chart_type: str, word_data: list):
         # 仪表盘展示TOP1词汇的词频（适配单值展示）
         top1_word, top1_count = top20_data[0] if top20_data else ("无数据", 0)
         c = (
-            Gauge(init_opts=opts.InitOpts(theme=ThemeType.LIGHT, width="100%", height="600px"))
+            Gauge(init_opts=_INIT)
             .add(f"词频", [(top1_word, top1_count)])
             .set_global_opts(
                 title_opts=opts.TitleOpts(title=f"高频词TOP1：{top1_word}"),
@@ -160,6 +262,11 @@ def generate_chart(chart_type: str, word_data: list):
         )
     return c
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def _chart_options_json(chart_type: str, word_data: tuple) -> str:
+    """按图表类型+数据缓存序列化后的ECharts配置（切换图表时无需重建pyecharts对象）"""
+    return generate_chart(chart_type, word_data).dump_options_with_quotes()
+
 # ---------------------- 4. Streamlit页面布局 ----------------------
 def main():
     st.title("📝 URL文章分词可视化分析工具")
@@ -185,54 +292,62 @@ def main():
         )
         st.markdown("---")
         st.info("💡 操作说明：输入URL→爬取文章→自动分词→选择图表类型查看结果")
+        if st.button("🧹 清除缓存"):
+            st.cache_data.clear()
 
     # 主页面：URL输入+爬取
     col1, col2 = st.columns([3, 1])
     with col1:
-        url = st.text_input("📌 输入文章URL", placeholder="例如：https://www.ithome.com/0/780/123.htm")
+        url_input = st.text_area("📌 输入文章URL（每行一个，支持批量）", placeholder="例如：https://www.ithome.com/0/780/123.htm", height=100)
     with col2:
         crawl_btn = st.button("🚀 爬取并分析", type="primary")
+    # 去除空行与重复URL（保持输入顺序）
+    urls = list(dict.fromkeys(line.strip() for line in url_input.splitlines() if line.strip()))
 
     # 初始化会话状态（保存词频数据，避免重复爬取）
     if "word_count" not in st.session_state:
         st.session_state.word_count = Counter()
 
     # 爬取+分析逻辑
-    if crawl_btn and url:
+    if crawl_btn and urls:
         with st.spinner("正在爬取文章并分析..."):
-            # 1. 爬取文章
-            article_text, error = crawl_url_article(url)
-            if error:
-                st.error(error)
+            # 1. 并发爬取文章
+            article_texts = []
+            for url, (article_text, error) in zip(urls, crawl_url_articles(urls)):
+                if error:
+                    st.error(f"{url}：{error}")
+                else:
+                    article_texts.append(article_text)
+            if not article_texts:
                 return
-            st.success(f"✅ 文章爬取成功！原始正文长度：{len(article_text)} 字")
+            st.success(f"✅ 文章爬取成功（{len(article_texts)}/{len(urls)}篇）！原始正文长度：{sum(map(len, article_texts))} 字")
 
-            # 2. 清洗分词+词频统计
-            seg_list, word_count = clean_and_segment(article_text)
+            # 2. 清洗分词+词频统计（多篇文章词频合并）
+            seg_count, word_count = 0, Counter()
+            for article_text in article_texts:
+                article_seg_count, article_word_count = _cached_segment(article_text)
+                seg_count += article_seg_count
+                word_count.update(article_word_count)
             st.session_state.word_count = word_count
-            st.info(f"📊 分词完成！有效分词数：{len(seg_list)} | 唯一词汇数：{len(word_count)}")
+            st.info(f"📊 分词完成！有效分词数：{seg_count} | 唯一词汇数：{len(word_count)}")
 
     # 展示结果（有词频数据时）
     if st.session_state.word_count:
         st.markdown("---")
-        # 过滤低频词
-        filtered_word_count = filter_low_freq_words(st.session_state.word_count, min_freq)
-        if not filtered_word_count:
+        # 过滤低频词并取TOP20
+        sorted_word_data = top_k_min_freq(st.session_state.word_count, min_freq)
+        if not sorted_word_data:
             st.warning(f"⚠️ 过滤后无数据（最小词频设为{min_freq}，可降低阈值重试）")
             return
         
-        # 排序取TOP20
-        sorted_word_data = filtered_word_count.most_common(20)
-        
         # 展示词频TOP20表格
         st.subheader("📈 词频排名TOP20（过滤低频词后）")
-        top20_df = pd.DataFrame(sorted_word_data, columns=["词汇", "出现次数"])
-        st.dataframe(top20_df, use_container_width=True)
+        st.dataframe([{"词汇": word, "出现次数": count} for word, count in sorted_word_data], use_container_width=True)
 
         # 生成并展示图表
         st.subheader(f"🎨 {chart_type}展示")
-        chart = generate_chart(chart_type, sorted_word_data)
-        st_pyecharts(chart, key=chart_type)  # key确保切换图表时重新渲染
+        chart_options = json.loads(_chart_options_json(chart_type, tuple(sorted_word_data)))
+        st_echarts(options=chart_options, key=chart_type)  # key确保切换图表时重新渲染
 
 if __name__ == "__main__":
     main()
\ No newline at end of file